@@ -0,0 +1,173 @@
+"""
+NRS Accounting - shared scraper helpers
+
+Session setup, cookie persistence and report-table parsing used by both
+nrs_scraper.py and nrs_daily_vendor_sales.py. The scripts import this
+module from their own directory.
+"""
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree
+import re
+from http.cookiejar import LoadError, MozillaCookieJar
+from pathlib import Path
+
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Compiled once; lxml evaluates these in C against the parsed report page.
+ROW_XP = etree.XPath(".//tr[contains(concat(' ', normalize-space(@class), ' '), ' Hover ')]")
+CELL_XP = etree.XPath("./td")
+HREF_XP = etree.XPath(".//a/@href")
+VID_RE = re.compile(r'apVendorId\[\]=(\d+)')
+
+_CURRENCY_STRIP = str.maketrans('', '', '$,')
+_PERCENT_STRIP = str.maketrans('', '', '%')
+_INT_STRIP = str.maketrans('', '', ',')
+
+
+def configure_session(session, base_url: str):
+    """
+    Set the browser User-Agent and mount a pooled, retrying adapter for NRS.
+
+    Single host: one pool, kept large enough for concurrent keep-alive reuse,
+    with backoff on transient 5xx so a hiccup doesn't drop the connection.
+    """
+    session.headers.update({'User-Agent': USER_AGENT})
+    session.mount(f"{base_url}/", HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3,
+                          status_forcelist=[500, 502, 503, 504],
+                          raise_on_status=False)
+    ))
+    return session
+
+
+def cell_text(cell) -> str:
+    """
+    Text of a table cell, normalized like BeautifulSoup's get_text(strip=True).
+
+    Each text fragment is stripped and the pieces joined with no separator,
+    so vendor names match what earlier versions of these scrapers produced.
+    Leaf cells skip the subtree walk.
+    """
+    if len(cell):
+        return ''.join(text.strip() for text in cell.itertext())
+    return (cell.text or '').strip()
+
+
+def parse_report_page(stream, encoding: str = None):
+    """
+    Parse a report page from a byte stream, stopping once ListSectionTable closes.
+
+    Only the page chrome ahead of the table is materialized; the footer and
+    trailing scripts are never tokenized. Returns the (possibly partial)
+    root element, or None for an empty body.
+    """
+    events = etree.iterparse(stream, events=('end',), tag='table', html=True,
+                             encoding=encoding, remove_comments=True)
+    try:
+        for _, table in events:
+            if table.get('id') == 'ListSectionTable':
+                return table.getroottree().getroot()
+    except etree.XMLSyntaxError:
+        return None
+    return events.root
+
+
+def fetch_report(session, url: str, params: dict = None):
+    """
+    GET a report page and parse it straight off the response stream.
+
+    Returns:
+        Tuple of (response, root element); the root is None unless the
+        status is 200 and the body contained a document. The response is
+        already closed, but its status_code and request remain usable.
+    """
+    with session.get(url, params=params, stream=True) as resp:
+        if resp.status_code != 200:
+            return resp, None
+        resp.raw.decode_content = True
+        doc = parse_report_page(resp.raw, resp.encoding)
+        # Drain what the parser skipped so the connection can be reused
+        resp.raw.read()
+    return resp, doc
+
+
+def parse_currency(value: str) -> float:
+    # Empty cells are the common non-numeric case; test for them up front
+    # rather than letting float('') raise
+    s = value.translate(_CURRENCY_STRIP) if value else ''
+    if not s:
+        return 0.0
+    try:
+        return float(s)
+    except ValueError:
+        return 0.0
+
+
+def parse_percent(value: str) -> float:
+    s = value.translate(_PERCENT_STRIP) if value else ''
+    if not s:
+        return 0.0
+    try:
+        return float(s)
+    except ValueError:
+        return 0.0
+
+
+def parse_int(value: str) -> int:
+    s = value.translate(_INT_STRIP) if value else ''
+    if not s:
+        return 0
+    try:
+        return int(s)
+    except ValueError:
+        return 0
+
+
+class CookieJarMixin:
+    """
+    Opt-in login reuse across runs for a scraper with session/BASE_URL/cookie_jar.
+
+    After login the session cookies are saved to cookie_jar; the next run's
+    resume_session() loads them and confirms the session is still live.
+    """
+    COOKIE_JAR = Path.home() / '.nrs_cookiejar'
+
+    def resume_session(self) -> bool:
+        """
+        Reuse cookies saved by a previous run instead of logging in again.
+
+        Returns:
+            True if the saved session is still authenticated
+        """
+        if not self.cookie_jar:
+            return False
+
+        jar = MozillaCookieJar(str(self.cookie_jar))
+        try:
+            jar.load(ignore_discard=True)
+        except (OSError, LoadError):
+            return False
+        self.session.cookies.update(jar)
+
+        resp = self.session.get(f"{self.BASE_URL}/")
+        self.logged_in = resp.status_code == 200 and (
+            'Log Out' in resp.text or 'applicationAction=logout' in resp.text
+        )
+        return self.logged_in
+
+    def _save_cookies(self):
+        """Persist session cookies for resume_session(); no-op without a jar path."""
+        if not self.cookie_jar:
+            return
+
+        jar = MozillaCookieJar(str(self.cookie_jar))
+        for cookie in self.session.cookies:
+            jar.set_cookie(cookie)
+        # The jar is as good as the password, so create it owner-only
+        Path(self.cookie_jar).touch(mode=0o600, exist_ok=True)
+        jar.save(ignore_discard=True)
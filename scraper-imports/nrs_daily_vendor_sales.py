@@ -17,25 +17,32 @@ Usage:
 """
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
 import csv
-import json
-import re
+import orjson
+import sys
 import argparse
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from nrs_common import (
+    CELL_XP, HREF_XP, ROW_XP, VID_RE, CookieJarMixin, cell_text, configure_session,
+    fetch_report, parse_currency,
+)
 
-class NRSVendorSales:
+
+_TABLE_XP = etree.XPath("//table[@id='ListSectionTable']")
+
+
+class NRSVendorSales(CookieJarMixin):
     BASE_URL = "https://www.nrsaccounting.com"
 
-    def __init__(self, username: str, password: str):
+    def __init__(self, username: str, password: str, cookie_jar: Path = None):
         self.username = username
         self.password = password
+        self.cookie_jar = cookie_jar
         self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        configure_session(self.session, self.BASE_URL)
         self.logged_in = False
 
     def login(self) -> bool:
@@ -54,6 +61,8 @@ class NRSVendorSales:
         })
 
         self.logged_in = 'Log Out' in resp.text or 'applicationAction=logout' in resp.text
+        if self.logged_in:
+            self._save_cookies()
         return self.logged_in
 
     def get_daily_vendor_sales(self, date: str) -> dict:
@@ -80,52 +89,45 @@ class NRSVendorSales:
             'frmGrouping': 'apVendorId'
         }
 
-        resp = self.session.get(url, params=params)
+        # Stream the body into lxml rather than materializing resp.text
+        resp, doc = fetch_report(self.session, url, params)
         if resp.status_code != 200:
             return {'date': date, 'vendors': [], 'totals': {}}
 
-        return self._parse_vendor_sales(resp.text, date)
+        return self._parse_vendor_sales(doc, date)
 
-    def _parse_vendor_sales(self, html: str, date: str) -> dict:
-        soup = BeautifulSoup(html, 'html.parser')
-        table = soup.find('table', {'id': 'ListSectionTable'})
+    def _parse_vendor_sales(self, doc, date: str) -> dict:
+        tables = _TABLE_XP(doc) if doc is not None else []
 
-        if not table:
+        if not tables:
             return {'date': date, 'vendors': [], 'totals': {}}
 
         vendors = []
-        total_sales = 0
-        total_vendor_amount = 0
-        total_retained = 0
+        # Running totals stay in float locals and are rounded once at the end
+        total_sales = 0.0
+        total_vendor_amount = 0.0
+        total_retained = 0.0
 
-        rows = table.find_all('tr', {'class': 'Hover'})
-
-        for row in rows:
-            cells = row.find_all('td')
+        for row in ROW_XP(tables[0]):
+            cells = CELL_XP(row)
             if len(cells) >= 6:
-                vendor_name = cells[0].get_text(strip=True)
+                vendor_name = cell_text(cells[0])
 
                 # Extract vendor_id from PDF link
-                vendor_id = None
-                for link in row.find_all('a', href=True):
-                    href = link.get('href', '')
-                    match = re.search(r'apVendorId\[\]=(\d+)', href)
-                    if match:
-                        vendor_id = match.group(1)
-                        break
-
-                sales = self._parse_currency(cells[2].get_text(strip=True))
-                vendor_amt = self._parse_currency(cells[4].get_text(strip=True))
-                retained = self._parse_currency(cells[5].get_text(strip=True))
-
-                vendor = {
+                match = VID_RE.search(' '.join(HREF_XP(row)))
+                vendor_id = match.group(1) if match else None
+
+                sales = parse_currency(cell_text(cells[2]))
+                vendor_amt = parse_currency(cell_text(cells[4]))
+                retained = parse_currency(cell_text(cells[5]))
+
+                vendors.append({
                     'vendor_id': vendor_id,
                     'vendor_name': vendor_name,
                     'total_sales': sales,
                     'vendor_amount': vendor_amt,
                     'retained_amount': retained
-                }
-                vendors.append(vendor)
+                })
 
                 total_sales += sales
                 total_vendor_amount += vendor_amt
@@ -142,13 +144,6 @@ class NRSVendorSales:
             }
         }
 
-    @staticmethod
-    def _parse_currency(value: str) -> float:
-        try:
-            return float(value.replace('$', '').replace(',', ''))
-        except (ValueError, AttributeError):
-            return 0.0
-
     def logout(self):
         if self.logged_in:
             self.session.get(f"{self.BASE_URL}/?applicationAction=logout")
@@ -174,6 +169,9 @@ def main():
                         help='Output file (default: stdout for JSON, auto-named for CSV)')
     parser.add_argument('--format', '-f', type=str, choices=['csv', 'json', 'table'],
                         default='table', help='Output format')
+    parser.add_argument('--reuse-session', action='store_true',
+                        help=f'Keep the login between runs in {NRSVendorSales.COOKIE_JAR} '
+                             '(skips login when still valid, and skips logout)')
 
     args = parser.parse_args()
 
@@ -185,42 +183,41 @@ def main():
     try:
         username, password = load_credentials(args.creds)
     except ValueError as e:
-        print(f"Error: {e}", file=__import__('sys').stderr)
+        print(f"Error: {e}", file=sys.stderr)
         return 1
 
-    scraper = NRSVendorSales(username, password)
+    scraper = NRSVendorSales(username, password,
+                             cookie_jar=NRSVendorSales.COOKIE_JAR if args.reuse_session else None)
 
     try:
-        if not scraper.login():
-            print("Login failed", file=__import__('sys').stderr)
+        if not scraper.resume_session() and not scraper.login():
+            print("Login failed", file=sys.stderr)
             return 1
 
         data = scraper.get_daily_vendor_sales(args.date)
 
         if args.format == 'json':
-            output = json.dumps(data, indent=2)
+            output = orjson.dumps(data, option=orjson.OPT_INDENT_2)
             if args.output:
-                with open(args.output, 'w') as f:
+                with open(args.output, 'wb') as f:
                     f.write(output)
             else:
-                print(output)
+                print(output.decode())
 
         elif args.format == 'csv':
             filename = args.output or f"vendor_sales_{args.date.replace('/', '-')}.csv"
             with open(filename, 'w', newline='') as f:
                 if data['vendors']:
-                    writer = csv.DictWriter(f, fieldnames=['vendor_id', 'vendor_name', 'total_sales', 'vendor_amount', 'retained_amount'])
-                    writer.writeheader()
-                    writer.writerows(data['vendors'])
+                    writer = csv.writer(f)
+                    writer.writerow(['vendor_id', 'vendor_name', 'total_sales', 'vendor_amount', 'retained_amount'])
+                    writer.writerows(
+                        (v['vendor_id'], v['vendor_name'], v['total_sales'], v['vendor_amount'], v['retained_amount'])
+                        for v in data['vendors']
+                    )
                     # Write totals row
-                    writer.writerow({
-                        'vendor_id': '',
-                        'vendor_name': 'TOTAL',
-                        'total_sales': data['totals']['total_sales'],
-                        'vendor_amount': data['totals']['total_vendor_amount'],
-                        'retained_amount': data['totals']['total_retained']
-                    })
-            print(f"Saved to {filename}", file=__import__('sys').stderr)
+                    t = data['totals']
+                    writer.writerow(('', 'TOTAL', t['total_sales'], t['total_vendor_amount'], t['total_retained']))
+            print(f"Saved to {filename}", file=sys.stderr)
 
         else:  # table format
             print(f"\n{'='*70}")
@@ -239,7 +236,9 @@ def main():
             print(f"{'='*70}\n")
 
     finally:
-        scraper.logout()
+        # Logging out would invalidate the cookies saved for the next run
+        if not args.reuse_session:
+            scraper.logout()
 
     return 0
 
@@ -7,28 +7,77 @@ with optional individual vendor sales detail and PDF URLs.
 """
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
 import csv
-import json
+import orjson
 import argparse
-import re
+import os
+import shutil
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from urllib.parse import urlencode
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
 
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
 
-class NRSScraper:
+from nrs_common import (
+    CELL_XP, HREF_XP, ROW_XP, VID_RE, CookieJarMixin, cell_text, configure_session,
+    fetch_report, parse_currency, parse_int, parse_percent,
+)
+
+
+# Requires the ListingTable class too, so a look-alike table isn't parsed as a report
+_TABLE_XP = etree.XPath(
+    "//table[@id='ListSectionTable']"
+    "[contains(concat(' ', normalize-space(@class), ' '), ' ListingTable ')]"
+)
+
+
+class NRSScraper(CookieJarMixin):
     BASE_URL = "https://www.nrsaccounting.com"
     PDF_URL = "https://www.nrsaccounting.com/ap/vendorInventorySalesPDF"
+    DETAIL_WORKERS = 8  # Must not exceed the adapter's pool_maxsize
+    CACHE_DB = Path.home() / '.nrs_cache.sqlite'
 
-    def __init__(self, username: str, password: str):
+    def __init__(self, username: str, password: str, cookie_jar: Path = None):
         self.username = username
         self.password = password
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.cookie_jar = cookie_jar
+        use_cache = os.environ.get('NRS_CACHE') == '1'
+        if use_cache and requests_cache is None:
+            print("NRS_CACHE=1 but requests-cache is not installed; running uncached")
+        if use_cache and requests_cache is not None:
+            # Opt-in on-disk cache so re-runs (e.g. another --format) skip the
+            # network. Only the totals/detail report is cached; PDFs, login and
+            # logout always go out. _fetch_report evicts any cached page that
+            # turns out not to be a report (e.g. a login page after expiry).
+            # The pages are vendor financials, so the db is owner-only like
+            # the cookie jar (SQLite gives its journal the same mode).
+            self.CACHE_DB.touch(mode=0o600, exist_ok=True)
+            self.CACHE_DB.chmod(0o600)
+            self.session = requests_cache.CachedSession(
+                str(self.CACHE_DB),
+                backend='sqlite',
+                allowable_methods=('GET',),
+                urls_expire_after={
+                    f"{self.BASE_URL}/ap/apVendorInventoryTotals*": 3600,
+                    '*': requests_cache.DO_NOT_CACHE,
+                }
+            )
+        else:
+            self.session = requests.Session()
+        configure_session(self.session, self.BASE_URL)
         self.logged_in = False
+        # Parsed totals pages by sorted params, so a repeat call in a run skips the GET
+        self._totals_cache = {}
 
     def login(self) -> bool:
         """Login to NRS Accounting and establish session."""
@@ -52,6 +101,7 @@ class NRSScraper:
 
         if 'Log Out' in resp.text or 'applicationAction=logout' in resp.text:
             self.logged_in = True
+            self._save_cookies()
             print("Login successful")
             return True
         elif 'Invalid' in resp.text or 'incorrect' in resp.text.lower():
@@ -59,10 +109,12 @@ class NRSScraper:
             return False
         else:
             self.logged_in = True
+            self._save_cookies()
             print("Login appears successful")
             return True
 
-    def _build_date_params(self, month: int = None, year: int = None,
+    @staticmethod
+    def _build_date_params(month: int = None, year: int = None,
                            start_date: str = None, end_date: str = None) -> dict:
         """Build date filter parameters."""
         if start_date and end_date:
@@ -87,14 +139,19 @@ class NRSScraper:
                 'frmYear': str(year),
             }
 
-    def _build_pdf_url(self, vendor_id: str, month: int = None, year: int = None,
-                       start_date: str = None, end_date: str = None,
-                       pdf_mode: str = 'download') -> str:
+    @classmethod
+    @lru_cache(maxsize=32)
+    def _build_pdf_url_template(cls, month: int = None, year: int = None,
+                                start_date: str = None, end_date: str = None,
+                                pdf_mode: str = 'download') -> str:
         """
-        Build PDF URL for a specific vendor.
+        Build the vendor-independent part of a PDF URL.
+
+        The result ends with an empty apVendorId[] value, so a vendor's URL is
+        the template with its ID appended. Cached since every vendor in a run
+        shares the same date filter.
 
         Args:
-            vendor_id: The vendor's ID
             month: Month number (1-12)
             year: Year
             start_date: Start date (MM/DD/YYYY)
@@ -102,12 +159,11 @@ class NRSScraper:
             pdf_mode: 'download' or 'view'
 
         Returns:
-            Full PDF URL
+            PDF URL missing only the vendor ID
         """
         params = {
             'go': 'yes',
             'search': '1',
-            'apVendorId[]': vendor_id,
             'rptSetupId': '434',
             'pdf': pdf_mode
         }
@@ -131,7 +187,26 @@ class NRSScraper:
                 'invoiceYear': str(year),
             })
 
-        return f"{self.PDF_URL}?{urlencode(params)}"
+        return f"{cls.PDF_URL}?{urlencode(params)}&apVendorId%5B%5D="
+
+    def _build_pdf_url(self, vendor_id: str, month: int = None, year: int = None,
+                       start_date: str = None, end_date: str = None,
+                       pdf_mode: str = 'download') -> str:
+        """
+        Build PDF URL for a specific vendor.
+
+        Args:
+            vendor_id: The vendor's ID
+            month: Month number (1-12)
+            year: Year
+            start_date: Start date (MM/DD/YYYY)
+            end_date: End date (MM/DD/YYYY)
+            pdf_mode: 'download' or 'view'
+
+        Returns:
+            Full PDF URL
+        """
+        return self._build_pdf_url_template(month, year, start_date, end_date, pdf_mode) + vendor_id
 
     def get_vendor_totals(self, month: int = None, year: int = None,
                           start_date: str = None, end_date: str = None) -> tuple[list[dict], dict]:
@@ -155,36 +230,38 @@ class NRSScraper:
         period = self._format_period(month, year, start_date, end_date)
         print(f"Fetching vendor totals for {period}...")
 
-        resp = self.session.get(report_url, params=params)
-        if resp.status_code != 200:
-            print(f"Failed to fetch report: {resp.status_code}")
-            return [], {}
+        cache_key = tuple(sorted(params.items()))
+        doc = self._totals_cache.get(cache_key)
+        if doc is None:
+            status, doc = self._fetch_report(report_url, params)
+            if status != 200:
+                print(f"Failed to fetch report: {status}")
+                return [], {}
+            # Only keep real reports, not a login/form page from an expired session
+            if self._find_listing_table(doc) is not None:
+                self._totals_cache[cache_key] = doc
 
-        vendors, vendor_ids = self._parse_vendor_totals(resp.text)
+        vendors, vendor_ids = self._parse_vendor_totals(doc)
 
         # Add PDF URLs to vendor data
+        pdf_url_template = self._build_pdf_url_template(month, year, start_date, end_date)
         for vendor in vendors:
             vendor_name = vendor['vendor']
             if vendor_name in vendor_ids:
                 vendor['vendor_id'] = vendor_ids[vendor_name]
-                vendor['pdf_url'] = self._build_pdf_url(
-                    vendor_ids[vendor_name],
-                    month=month, year=year,
-                    start_date=start_date, end_date=end_date
-                )
+                vendor['pdf_url'] = pdf_url_template + vendor_ids[vendor_name]
             else:
                 vendor['vendor_id'] = ''
                 vendor['pdf_url'] = ''
 
         return vendors, vendor_ids
 
-    def _parse_vendor_totals(self, html: str) -> tuple[list[dict], dict]:
+    def _parse_vendor_totals(self, doc) -> tuple[list[dict], dict]:
         """Parse vendor totals and extract vendor IDs."""
-        soup = BeautifulSoup(html, 'html.parser')
-        table = soup.find('table', {'class': 'ListingTable', 'id': 'ListSectionTable'})
+        table = self._find_listing_table(doc)
 
-        if not table:
-            if 'theForm' in html:
+        if table is None:
+            if doc is not None and 'theForm' in etree.tostring(doc, encoding='unicode'):
                 print("Got form page - report may require different parameters")
             else:
                 print("Could not find vendor totals table")
@@ -193,30 +270,25 @@ class NRSScraper:
         vendors = []
         vendor_ids = {}
 
-        rows = table.find_all('tr', {'class': 'Hover'})
-
-        for row in rows:
-            cells = row.find_all('td')
+        for row in ROW_XP(table):
+            cells = CELL_XP(row)
             if len(cells) >= 6:
-                vendor_name = cells[0].get_text(strip=True)
+                vendor_name = cell_text(cells[0])
 
                 vendor_data = {
                     'vendor': vendor_name,
-                    'quantity': self._parse_int(cells[1].get_text(strip=True)),
-                    'total_price': self._parse_currency(cells[2].get_text(strip=True)),
-                    'vendor_payment_pct': self._parse_percent(cells[3].get_text(strip=True)),
-                    'vendor_amount': self._parse_currency(cells[4].get_text(strip=True)),
-                    'retained_amount': self._parse_currency(cells[5].get_text(strip=True))
+                    'quantity': parse_int(cell_text(cells[1])),
+                    'total_price': parse_currency(cell_text(cells[2])),
+                    'vendor_payment_pct': parse_percent(cell_text(cells[3])),
+                    'vendor_amount': parse_currency(cell_text(cells[4])),
+                    'retained_amount': parse_currency(cell_text(cells[5]))
                 }
                 vendors.append(vendor_data)
 
                 # Extract vendor ID from PDF link
-                for link in row.find_all('a', href=True):
-                    href = link.get('href', '')
-                    match = re.search(r'apVendorId\[\]=(\d+)', href)
-                    if match:
-                        vendor_ids[vendor_name] = match.group(1)
-                        break
+                match = VID_RE.search(' '.join(HREF_XP(row)))
+                if match:
+                    vendor_ids[vendor_name] = match.group(1)
 
         print(f"Parsed {len(vendors)} vendor records")
         return vendors, vendor_ids
@@ -233,20 +305,13 @@ class NRSScraper:
         if not self.logged_in:
             raise RuntimeError("Not logged in. Call login() first.")
 
-        report_url = f"{self.BASE_URL}/ap/apVendorInventoryTotals"
-        params = {
-            'go': 'yes',
-            'search': '1',
-            'frmGrouping': 'invStockId',  # Group by item
-            'apVendorId[]': vendor_id,
-            **self._build_date_params(month, year, start_date, end_date)
-        }
+        report_url = self._build_detail_url_template(month, year, start_date, end_date) + vendor_id
 
-        resp = self.session.get(report_url, params=params)
-        if resp.status_code != 200:
+        status, doc = self._fetch_report(report_url)
+        if status != 200:
             return []
 
-        items = self._parse_vendor_detail(resp.text, vendor_name, vendor_id)
+        items = self._parse_vendor_detail(doc, vendor_name, vendor_id)
 
         # Add PDF URL to each item row
         pdf_url = self._build_pdf_url(
@@ -259,35 +324,97 @@ class NRSScraper:
 
         return items
 
-    def _parse_vendor_detail(self, html: str, vendor_name: str, vendor_id: str) -> list[dict]:
+    @classmethod
+    @lru_cache(maxsize=32)
+    def _build_detail_url_template(cls, month: int = None, year: int = None,
+                                   start_date: str = None, end_date: str = None) -> str:
+        """
+        Build the item-detail report URL minus the vendor ID.
+
+        Encoded once per date filter so each vendor's request only appends
+        its ID, rather than requests re-encoding the full params dict.
+        """
+        params = {
+            'go': 'yes',
+            'search': '1',
+            'frmGrouping': 'invStockId',  # Group by item
+            **cls._build_date_params(month, year, start_date, end_date)
+        }
+        return f"{cls.BASE_URL}/ap/apVendorInventoryTotals?{urlencode(params)}&apVendorId%5B%5D="
+
+    def _parse_vendor_detail(self, doc, vendor_name: str, vendor_id: str) -> list[dict]:
         """Parse individual item sales for a vendor."""
-        soup = BeautifulSoup(html, 'html.parser')
-        table = soup.find('table', {'class': 'ListingTable', 'id': 'ListSectionTable'})
+        table = self._find_listing_table(doc)
 
-        if not table:
+        if table is None:
             return []
 
         items = []
-        rows = table.find_all('tr', {'class': 'Hover'})
 
-        for row in rows:
-            cells = row.find_all('td')
+        for row in ROW_XP(table):
+            cells = CELL_XP(row)
             if len(cells) >= 7:
                 item_data = {
                     'vendor': vendor_name,
                     'vendor_id': vendor_id,
-                    'stock_number': cells[0].get_text(strip=True),
-                    'item_name': cells[1].get_text(strip=True),
-                    'description': cells[2].get_text(strip=True),
-                    'quantity': self._parse_int(cells[3].get_text(strip=True)),
-                    'total_price': self._parse_currency(cells[4].get_text(strip=True)),
-                    'vendor_amount': self._parse_currency(cells[5].get_text(strip=True)),
-                    'retained_amount': self._parse_currency(cells[6].get_text(strip=True))
+                    'stock_number': cell_text(cells[0]),
+                    'item_name': cell_text(cells[1]),
+                    'description': cell_text(cells[2]),
+                    'quantity': parse_int(cell_text(cells[3])),
+                    'total_price': parse_currency(cell_text(cells[4])),
+                    'vendor_amount': parse_currency(cell_text(cells[5])),
+                    'retained_amount': parse_currency(cell_text(cells[6]))
                 }
                 items.append(item_data)
 
         return items
 
+    def iter_vendor_details(self, vendor_ids: dict,
+                            month: int = None, year: int = None,
+                            start_date: str = None, end_date: str = None) -> Iterator[dict]:
+        """
+        Fetch individual sales for all vendors, yielding items as they arrive.
+
+        At most DETAIL_WORKERS vendors are submitted at a time and results are
+        yielded in vendor_ids order; each vendor's items are released once
+        yielded, so memory stays bounded by the in-flight window.
+
+        Args:
+            vendor_ids: Dict mapping vendor name to vendor ID
+
+        Yields:
+            Item-level sales dicts, vendor by vendor
+        """
+        total = len(vendor_ids)
+        pending = iter(vendor_ids.items())
+        window = deque()
+        executor = ThreadPoolExecutor(max_workers=self.DETAIL_WORKERS)
+
+        def submit_next():
+            for vendor_name, vendor_id in pending:
+                window.append((vendor_name, executor.submit(
+                    self.get_vendor_detail,
+                    vendor_id, vendor_name,
+                    month=month, year=year,
+                    start_date=start_date, end_date=end_date
+                )))
+                return
+
+        try:
+            for _ in range(self.DETAIL_WORKERS):
+                submit_next()
+            for i in range(1, total + 1):
+                vendor_name, future = window.popleft()
+                submit_next()
+                items = future.result()
+                del future
+                print(f"  [{i}/{total}] Fetched details for {vendor_name}")
+                yield from items
+                del items
+        finally:
+            # Don't keep fetching if the consumer stops early
+            executor.shutdown(cancel_futures=True)
+
     def get_all_vendor_details(self, vendor_ids: dict,
                                month: int = None, year: int = None,
                                start_date: str = None, end_date: str = None) -> list[dict]:
@@ -300,17 +427,11 @@ class NRSScraper:
         Returns:
             List of all item-level sales across all vendors
         """
-        all_items = []
-        total = len(vendor_ids)
-
-        for i, (vendor_name, vendor_id) in enumerate(vendor_ids.items(), 1):
-            print(f"  [{i}/{total}] Fetching details for {vendor_name}...")
-            items = self.get_vendor_detail(
-                vendor_id, vendor_name,
-                month=month, year=year,
-                start_date=start_date, end_date=end_date
-            )
-            all_items.extend(items)
+        all_items = list(self.iter_vendor_details(
+            vendor_ids,
+            month=month, year=year,
+            start_date=start_date, end_date=end_date
+        ))
 
         print(f"Total items fetched: {len(all_items)}")
         return all_items
@@ -334,14 +455,39 @@ class NRSScraper:
             pdf_mode='download'
         )
 
-        resp = self.session.get(pdf_url, stream=True)
-        if resp.status_code == 200 and 'application/pdf' in resp.headers.get('Content-Type', ''):
-            with open(output_path, 'wb') as f:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            return True
+        with self.session.get(pdf_url, stream=True) as resp:
+            if resp.status_code == 200 and 'application/pdf' in resp.headers.get('Content-Type', ''):
+                resp.raw.decode_content = True
+                with open(output_path, 'wb') as f:
+                    shutil.copyfileobj(resp.raw, f, length=1024 * 1024)
+                return True
         return False
 
+    def _fetch_report(self, url: str, params: dict = None):
+        """
+        GET and parse a report page, see nrs_common.fetch_report().
+
+        Returns:
+            Tuple of (status_code, root element)
+        """
+        resp, doc = fetch_report(self.session, url, params)
+
+        # Checked after parsing rather than via requests-cache's filter_fn,
+        # which would have to read the body and break the streamed parse
+        cache = getattr(self.session, 'cache', None)
+        if cache is not None and self._find_listing_table(doc) is None:
+            cache.delete(requests=[resp.request])
+
+        return resp.status_code, doc
+
+    @staticmethod
+    def _find_listing_table(doc):
+        """Return the report's ListSectionTable element, or None if absent."""
+        if doc is None:
+            return None
+        tables = _TABLE_XP(doc)
+        return tables[0] if tables else None
+
     @staticmethod
     def _format_period(month: int = None, year: int = None,
                        start_date: str = None, end_date: str = None) -> str:
@@ -353,27 +499,6 @@ class NRSScraper:
         else:
             return f"Year {year}"
 
-    @staticmethod
-    def _parse_currency(value: str) -> float:
-        try:
-            return float(value.replace('$', '').replace(',', ''))
-        except (ValueError, AttributeError):
-            return 0.0
-
-    @staticmethod
-    def _parse_percent(value: str) -> float:
-        try:
-            return float(value.replace('%', ''))
-        except (ValueError, AttributeError):
-            return 0.0
-
-    @staticmethod
-    def _parse_int(value: str) -> int:
-        try:
-            return int(value.replace(',', ''))
-        except (ValueError, AttributeError):
-            return 0
-
     def logout(self):
         if self.logged_in:
             self.session.get(f"{self.BASE_URL}/?applicationAction=logout")
@@ -381,25 +506,91 @@ class NRSScraper:
             print("Logged out")
 
 
-def save_to_csv(data: list[dict], filename: str):
-    if not data:
+@contextmanager
+def _atomic_open(filename: str, mode: str, **kwargs):
+    """
+    Open filename.tmp for writing and move it over filename only on success.
+
+    If the block raises (or a streaming generator is abandoned), the partial
+    file is removed and any existing output is left untouched.
+    """
+    tmp_name = f"{filename}.tmp"
+    f = open(tmp_name, mode, **kwargs)
+    try:
+        yield f
+    except BaseException:
+        f.close()
+        os.remove(tmp_name)
+        raise
+    f.close()
+    os.replace(tmp_name, filename)
+
+
+def _stream_csv(data: Iterable[dict], filename: str) -> Iterator[dict]:
+    """Write rows to a CSV file as they pass through; no file if there are none."""
+    rows = iter(data)
+    first = next(rows, None)
+    if first is None:
         print(f"No data to save to {filename}")
         return
 
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=data[0].keys())
-        writer.writeheader()
-        writer.writerows(data)
+    fieldnames = list(first.keys())
+    count = 0
 
-    print(f"Saved {len(data)} records to {filename}")
+    with _atomic_open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        for d in chain((first,), rows):
+            writer.writerow([d.get(k, '') for k in fieldnames])
+            count += 1
+            yield d
+
+    print(f"Saved {count} records to {filename}")
+
+
+def _stream_json(data: Iterable[dict], filename: str, metadata: dict = None) -> Iterator[dict]:
+    """
+    Write rows to a JSON file as they pass through; no file if there are none.
+
+    The document has the metadata keys, a "data" array and a trailing
+    "record_count", laid out as orjson's OPT_INDENT_2 would.
+    """
+    rows = iter(data)
+    first = next(rows, None)
+    if first is None:
+        print(f"No data to save to {filename}")
+        return
+
+    count = 0
+
+    with _atomic_open(filename, 'wb') as f:
+        f.write(b'{\n')
+        for key, value in (metadata or {}).items():
+            f.write(b'  ' + orjson.dumps(key) + b': '
+                    + orjson.dumps(value, option=orjson.OPT_INDENT_2).replace(b'\n', b'\n  ')
+                    + b',\n')
+        f.write(b'  "data": [')
+        for d in chain((first,), rows):
+            f.write((b',\n    ' if count else b'\n    ')
+                    + orjson.dumps(d, option=orjson.OPT_INDENT_2).replace(b'\n', b'\n    '))
+            count += 1
+            yield d
+        f.write(b'\n  ],\n  "record_count": %d\n}' % count)
+
+    print(f"Saved to {filename}")
+
+
+def save_to_csv(data: list[dict], filename: str):
+    for _ in _stream_csv(data, filename):
+        pass
 
 
 def save_to_json(data: list[dict], filename: str, metadata: dict = None):
     output = metadata or {}
     output['data'] = data
 
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2)
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
 
     print(f"Saved to {filename}")
 
@@ -416,21 +607,32 @@ def load_credentials(creds_file: str = None) -> tuple[str, str]:
     raise ValueError("Could not load credentials")
 
 
-def print_summary(data: list[dict], period: str, is_detail: bool = False):
-    if not data:
+def print_summary(data: Iterable[dict], period: str, is_detail: bool = False):
+    # Single pass, so a streamed detail run can be summarized as it is written
+    count = 0
+    total_qty = 0
+    total_sales = 0.0
+    total_vendor_amount = 0.0
+    total_retained = 0.0
+    vendors = set()
+
+    for v in data:
+        count += 1
+        total_qty += v['quantity']
+        total_sales += v['total_price']
+        total_vendor_amount += v['vendor_amount']
+        total_retained += v['retained_amount']
+        vendors.add(v['vendor'])
+
+    if not count:
         return
 
-    total_sales = sum(v['total_price'] for v in data)
-    total_vendor_amount = sum(v['vendor_amount'] for v in data)
-    total_retained = sum(v['retained_amount'] for v in data)
-    total_qty = sum(v['quantity'] for v in data)
-
     print(f"\n--- {'Detail' if is_detail else 'Summary'} for {period} ---")
     if is_detail:
-        print(f"Total Items: {len(data)}")
-        print(f"Unique Vendors: {len(set(v['vendor'] for v in data))}")
+        print(f"Total Items: {count}")
+        print(f"Unique Vendors: {len(vendors)}")
     else:
-        print(f"Vendors: {len(data)}")
+        print(f"Vendors: {count}")
     print(f"Total Quantity: {total_qty:,}")
     print(f"Total Sales: ${total_sales:,.2f}")
     print(f"Total Vendor Amount: ${total_vendor_amount:,.2f}")
@@ -476,6 +678,9 @@ Examples:
                         help='Output filename (without extension)')
     parser.add_argument('--format', '-f', type=str, choices=['csv', 'json', 'both'],
                         default='csv', help='Output format')
+    parser.add_argument('--reuse-session', action='store_true',
+                        help=f'Keep the login between runs in {NRSScraper.COOKIE_JAR} '
+                             '(skips login when still valid, and skips logout)')
 
     args = parser.parse_args()
 
@@ -497,10 +702,13 @@ Examples:
         print(f"Error loading credentials: {e}")
         return 1
 
-    scraper = NRSScraper(username, password)
+    scraper = NRSScraper(username, password,
+                         cookie_jar=NRSScraper.COOKIE_JAR if args.reuse_session else None)
 
     try:
-        if not scraper.login():
+        if scraper.resume_session():
+            print("Reusing saved session")
+        elif not scraper.login():
             return 1
 
         # Build date params for reuse
@@ -540,27 +748,29 @@ Examples:
             # Get individual item details if requested
             if args.detail and vendor_ids:
                 print(f"\nFetching individual item sales for {len(vendor_ids)} vendors...")
-                detail_data = scraper.get_all_vendor_details(vendor_ids, **date_kwargs)
-
-                if detail_data:
-                    if args.format in ('csv', 'both'):
-                        save_to_csv(detail_data, f"{output_base}_detail.csv")
-
-                    if args.format in ('json', 'both'):
-                        metadata = {
-                            'report': 'AP Vendor Totals - Item Detail',
-                            'period': period,
-                            'generated': datetime.now().isoformat(),
-                            'record_count': len(detail_data)
-                        }
-                        save_to_json(detail_data, f"{output_base}_detail.json", metadata)
-
-                    print_summary(detail_data, period, is_detail=True)
+                # Items are written as each vendor arrives rather than collected
+                # first, so a long --detail run only holds a few vendors at once
+                detail_rows = scraper.iter_vendor_details(vendor_ids, **date_kwargs)
+
+                if args.format in ('csv', 'both'):
+                    detail_rows = _stream_csv(detail_rows, f"{output_base}_detail.csv")
+
+                if args.format in ('json', 'both'):
+                    metadata = {
+                        'report': 'AP Vendor Totals - Item Detail',
+                        'period': period,
+                        'generated': datetime.now().isoformat()
+                    }
+                    detail_rows = _stream_json(detail_rows, f"{output_base}_detail.json", metadata)
+
+                print_summary(detail_rows, period, is_detail=True)
         else:
             print("No data retrieved")
 
     finally:
-        scraper.logout()
+        # Logging out would invalidate the cookies saved for the next run
+        if not args.reuse_session:
+            scraper.logout()
 
     return 0
 